@@ -20,14 +20,24 @@ when launched from the iOS home screen:
   launched.
 
 Protocol:
-1) An application should create an instance of class AppSingleLaunch, and use
-   it to test if the application is already active, using the is_active()
-   method. If yes, the application should simply exit. If not, the application
-   should declare its main UI view, using the will_present() method, and
-   present the view. Here is an example:
+1) An application should create an instance of class AppSingleLaunch, and call
+   its launch() method with a callable which builds the application's main UI
+   view. If the application is already active, launch() returns None and the
+   application should simply exit. If not, launch() builds and declares the
+   main UI view, and returns it so that the application can present it. Here
+   is an example:
 
         import app_single_launch
 
+        app = AppSingleLaunch("MyApp")
+        view = app.launch(lambda: MyAppView(app))
+        if view:
+            view.present()
+
+   launch() is equivalent to testing if the application is already active,
+   using the is_active() method, then declaring the main UI view, using the
+   will_present() method, both of which remain available:
+
         app = AppSingleLaunch("MyApp")
         if not app.is_active():
             view = MyAppView(app)
@@ -52,12 +62,15 @@ lock file some information about the last application launched:
 - Its name, as passed to single_launch.launching()
 - The id of the ui.View instance for its main view, as passed to single_launch.
   launching(). This is later used to determine if the view is still on screen
-  (when an object is still associated with the id), and to close the app's view.
+  (when a view is still registered under that id), and to close the app's view.
   After several tests, it turns out we must use an ui.View object for this
   purpose, as they seem to persist better than other objects after the cleanup
   pykit-preflight.py does when an app is launched from the home screen.
-The location of the lock file is defined by global variable LOCK_PATH. The
-default location is in the 'site-packages' directory.
+The lock file holds the UTF-8 encoded app name and view id, separated by a NUL
+character. A lock file which can't be parsed, such as one written in the JSON
+format of previous releases, is ignored. The location of the lock file is
+defined by global variable LOCK_PATH. The default location is in the
+'site-packages' directory.
 
 Known issue:
 - When an app is on screen, then launched again from its home screen shortcut,
@@ -66,14 +79,20 @@ Known issue:
 
 26-Feb-2019 TPO - Created this module
 28-Feb-2019 TPO - Initial release
- 3-Mar-2019 TPO - Wrapped the code into the AppSingleLaunch class """
+ 3-Mar-2019 TPO - Wrapped the code into the AppSingleLaunch class
+14-Oct-2026 TPO - Resolve view ids through a weakref registry instead of
+                  scanning gc.get_objects()
+14-Oct-2026 TPO - Added the AppSingleLaunch.launch() method
+14-Oct-2026 TPO - Wait for the previous app's view to close by polling it,
+                  instead of sleeping for 1 second
+14-Oct-2026 TPO - Lock file is now NUL separated text, written atomically. A
+                  lock file in the previous JSON format is ignored """
 
 
-import gc
-import json
-from pathlib import Path
+import os
 import time
-from typing import Any
+from typing import Any, Callable, Optional, Tuple
+import weakref
 
 import ui
 
@@ -85,19 +104,39 @@ __all__ = [
 
 DEBUG = False
 LOCK_PATH = '~/Documents/site-packages/single_launch.lock'
+CLOSE_POLL_INTERVAL = 0.02  # Seconds between two checks that a view is closed
+CLOSE_POLL_COUNT = 50  # Max number of checks, i.e. wait at most 1 second
 
 
-def _object_for_id(id_: int) -> Any:
-    """ Return an object, given its id. """
+# Registry of the main views declared via will_present(), keyed by view id.
+# It is attached to the ui module so that it survives this module being
+# reloaded (or unloaded by pykit-preflight.py) between two app launches.
+# Views are weakly referenced: once a view has been released, its entry
+# disappears and the id stored in the lock file no longer resolves.
+_views: 'weakref.WeakValueDictionary[int, ui.View]' = getattr(
+    ui, '_app_single_launch_views', weakref.WeakValueDictionary())
+ui._app_single_launch_views = _views
+
+
+def _parse_lock(raw: bytes) -> Optional[Tuple[str, int]]:
+    """ Return the (app, view id) stored in raw lock file contents.
+
+    Returns None if the contents can't be parsed, for instance for a lock file
+    written in the JSON format used by previous releases of this module. """
+    (app, _, view_id) = raw.partition(b'\x00')
+    try:
+        return (app.decode(), int(view_id))
+    except (UnicodeDecodeError, ValueError):
+        return None
 
-    # Do a complete garbage collect, to avoid false positives in case the
-    # object was still in use recently. In the context of AppSingleLaunch,
-    # this would happen if an app was closed, then launched again immediately.
-    gc.collect()
-    for obj in gc.get_objects():
-        if id(obj) == id_:
-            return obj
-    return None
+
+def _object_for_id(id_: int) -> Any:
+    """ Return the view registered with will_present(), given its id. """
+    # No garbage collection is required to avoid false positives: a released
+    # view is reclaimed by reference counting, which removes it from _views,
+    # and will_close() removes the entry of a closed view explicitly, even if
+    # the view is kept alive by a reference cycle.
+    return _views.get(id_)
 
 
 class AppSingleLaunch:
@@ -110,6 +149,102 @@ class AppSingleLaunch:
         - app: application name, which should be unique (but this is not
         enforced). """
         self.app = app
+        self._lock_path_str = os.path.expanduser(LOCK_PATH)
+        # (st_mtime_ns, (lock_app, lock_view_id)) of the last lock file read,
+        # (st_mtime_ns, None) if it couldn't be parsed
+        self._lock_cache: \
+            Optional[Tuple[int, Optional[Tuple[str, int]]]] = None
+
+    def _read_lock(self) -> Optional[Tuple[str, int]]:
+        """ Return the (app, view id) stored in the lock file, or None.
+
+        None is returned if there is no lock file, or if it can't be parsed, in
+        which case it is a leftover which can be safely ignored.
+
+        The parsed contents are cached, and the lock file is only parsed again
+        when its modification time has changed since the last read. """
+        # Open first and stat the open file, so that the lock file can't be
+        # removed by another app's will_close() in between.
+        try:
+            lock_file = open(self._lock_path_str, 'rb')
+        except FileNotFoundError:
+            self._lock_cache = None
+            return None
+        with lock_file:
+            mtime = os.fstat(lock_file.fileno()).st_mtime_ns
+            if self._lock_cache is None or self._lock_cache[0] != mtime:
+                self._lock_cache = (mtime, _parse_lock(lock_file.read()))
+        return self._lock_cache[1]
+
+    def _lock_state(self) -> Tuple[Optional[str], Any]:
+        """ Return the app name and main view of the last app launched.
+
+        Returns (None, None) if there is no valid lock file. The view is None
+        when the id in the lock file no longer designates a live view. """
+        lock = self._read_lock()
+        if not lock:
+            return (None, None)
+        (lock_app, lock_view_id) = lock
+        lock_view = _object_for_id(lock_view_id)
+        if DEBUG:
+            print("- Lock file =", lock_app, lock_view_id,
+                  "valid" if lock_view else "invalid")
+        return (lock_app, lock_view)
+
+    def _take_over(self, view: ui.View, lock_app: Optional[str],
+                   lock_view: Any) -> None:
+        """ Close the view of the previous app, if any, and lock view. """
+        if lock_view and isinstance(lock_view, ui.View):
+            if DEBUG:
+                print(f"- Closing app {lock_app}")
+            lock_view.close()
+            # Wait for the view to close properly, but no longer than required
+            for _ in range(CLOSE_POLL_COUNT):
+                if not lock_view.on_screen:
+                    break
+                time.sleep(CLOSE_POLL_INTERVAL)
+        # else: lock is a leftover from a previous Pythonista session
+        #       and can be safely ignored.
+        _views[id(view)] = view
+        # The lock cache reflects the lock file as read by _lock_state(), skip
+        # the write if the lock file already holds the right contents.
+        if self._lock_cache is None or \
+                self._lock_cache[1] != (self.app, id(view)):
+            # Write to a temporary file, then rename it, so that the lock file
+            # is never left truncated if Pythonista is killed in the middle.
+            tmp_path = self._lock_path_str + '.tmp'
+            with open(tmp_path, 'wb') as lock_file:
+                lock_file.write(f"{self.app}\x00{id(view)}".encode())
+            os.replace(tmp_path, self._lock_path_str)
+            self._lock_cache = None
+        if DEBUG:
+            print(f"- Launching app {self.app}\n- Lock file =", self.app, id(view))
+
+    def launch(self, view_factory: Callable[[], ui.View]) -> Optional[ui.View]:
+        """ Test if the application is active, and if not, declare its view.
+
+        This is equivalent to calling is_active(), then will_present(), but
+        the lock file is only read once.
+
+        Arguments:
+        - view_factory: callable with no arguments, returning the ui.View
+          instance for the app's main view. It is only called if the
+          application is not already active.
+
+        Returns:
+        - None if the application is already running, in which case the caller
+          should do nothing and exit.
+        - The app's main view otherwise, which the caller should present. """
+        if DEBUG:
+            print(f"launch(), app = {self.app}")
+        (lock_app, lock_view) = self._lock_state()
+        if lock_app == self.app and lock_view:
+            if DEBUG:
+                print(f"- App {self.app} already active")
+            return None
+        view = view_factory()
+        self._take_over(view, lock_app, lock_view)
+        return view
 
     def is_active(self) -> bool:
         """ Test if the application is already active.
@@ -122,18 +257,11 @@ class AppSingleLaunch:
           main view by calling the will_present() method."""
         if DEBUG:
             print(f"is_active(), app = {self.app}")
-        lock_path = Path(LOCK_PATH).expanduser()
-        if lock_path.exists():
-            with open(lock_path) as lock_file:
-                (lock_app, lock_view_id) = tuple(json.load(lock_file))
-            lock_view = _object_for_id(lock_view_id)
+        (lock_app, lock_view) = self._lock_state()
+        if lock_app == self.app and lock_view:
             if DEBUG:
-                print("- Lock file =", lock_app, lock_view_id,
-                      "valid" if lock_view else "invalid")
-            if lock_app == self.app and lock_view:
-                if DEBUG:
-                    print(f"- App {self.app} already active")
-                return True
+                print(f"- App {self.app} already active")
+            return True
         if DEBUG:
             print(f"- App {self.app} not active")
         return False
@@ -145,37 +273,29 @@ class AppSingleLaunch:
         - view: ui.View instance for the app's main view. """
         if DEBUG:
             print(f"will_present({id(view)}), app = {self.app}")
-        lock_path = Path(LOCK_PATH).expanduser()
-        if lock_path.exists():
-            with open(lock_path) as lock_file:
-                (lock_app, lock_view_id) = tuple(json.load(lock_file))
-            lock_view = _object_for_id(lock_view_id)
-            if DEBUG:
-                print("- Lock file =", lock_app, lock_view_id,
-                      "valid" if lock_view else "invalid")
-            if lock_app == self.app and lock_view:
-                raise ValueError(f"App {self.app} is already active, cannot "
-                                 f"call will_present() against it.")
-            else:
-                if lock_view and isinstance(lock_view, ui.View):
-                    if DEBUG:
-                        print(f"- Closing app {lock_app}")
-                    lock_view.close()
-                    time.sleep(1)  # Required for view to close properly
-                # else: lock is a leftover from a previous Pythonista session
-                #       and can be safely ignored.
-        with open(lock_path, 'w') as lock_file:
-            json.dump([self.app, id(view)], lock_file)
-        if DEBUG:
-            print(f"- Launching app {self.app}\n- Lock file =", self.app, id(view))
+        (lock_app, lock_view) = self._lock_state()
+        if lock_app == self.app and lock_view:
+            raise ValueError(f"App {self.app} is already active, cannot "
+                             f"call will_present() against it.")
+        self._take_over(view, lock_app, lock_view)
 
     def will_close(self) -> None:
         """ Declare that the application is about to close its main view. """
-        lock_path = Path(LOCK_PATH).expanduser()
-        if lock_path.exists():
-            with open(lock_path) as lock_file:
-                (lock_app, lock_view_id) = tuple(json.load(lock_file))
+        try:
+            with open(self._lock_path_str, 'rb') as lock_file:
+                raw = lock_file.read()
+        except FileNotFoundError:
+            return
+        lock = _parse_lock(raw)
+        if lock:
+            (lock_app, lock_view_id) = lock
             if lock_app != self.app:
                 raise ValueError(f"App {self.app} if not active, "
                                  f"{lock_app} is active")
-            lock_path.unlink()
+            _views.pop(lock_view_id, None)
+        # else: lock is a leftover which can't be parsed, remove it
+        try:
+            os.unlink(self._lock_path_str)
+        except FileNotFoundError:
+            pass
+        self._lock_cache = None
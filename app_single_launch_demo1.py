@@ -20,7 +20,6 @@ class MainView(ui.View):
 
 if __name__ == '__main__':
     app = AppSingleLaunch("Demo app 1")
-    if not app.is_active():
-        view = MainView(app)
-        app.will_present(view)
+    view = app.launch(lambda: MainView(app))
+    if view:
         view.present()
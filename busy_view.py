@@ -3,7 +3,11 @@
 Based on code by omz (https://gist.github.com/omz/e3433ebba20c92b63111)
 
 Revision history:
-13-Fev-2019 TPO - Initial release """
+13-Fev-2019 TPO - Initial release
+14-Oct-2026 TPO - Backdrop is centered in layout(), it was misplaced when the
+                  view was created with an empty frame
+14-Oct-2026 TPO - show() and hide() don't restart / stop the busy indicator
+                  when the state is unchanged """
 
 import ui
 
@@ -14,7 +18,7 @@ class BusyView(ui.View):
         """ Initialize a BusyView instance. """
         self.flex = 'WH'
         self.background_color = (0, 0, 0, 0.35)
-        backdrop = ui.View(frame=(self.center.x - 50, self.center.y - 50, 100, 100))
+        self.backdrop = backdrop = ui.View(frame=(0, 0, 100, 100))
         backdrop.background_color = (0, 0, 0, 0.7)
         backdrop.corner_radius = 8.0
         backdrop.flex = 'TLRB'
@@ -24,14 +28,29 @@ class BusyView(ui.View):
         backdrop.add_subview(spinner)
         self.add_subview(backdrop)
         self.hidden = True
+        self._shown = False
+
+    def layout(self) -> None:
+        """ Center the backdrop, each time the view is resized. """
+        self.backdrop.center = (self.width / 2, self.height / 2)
 
     def show(self) -> None:
-        """ Show the busy indicator, on top of its parent view. """
-        self.spinner.start()
-        self.hidden = False
+        """ Show the busy indicator, on top of its parent view.
+
+        If the busy indicator is already shown, it is only brought back on top
+        of its parent view's subviews. """
+        if not self._shown:
+            self.spinner.start()
+            self.hidden = False
+            self._shown = True
         self.bring_to_front()
 
     def hide(self) -> None:
-        """ Hide the busy indicator. """
+        """ Hide the busy indicator.
+
+        Does nothing if the busy indicator is already hidden. """
+        if not self._shown:
+            return
         self.spinner.stop()
         self.hidden = True
+        self._shown = False
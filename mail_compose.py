@@ -15,11 +15,19 @@ an improvement picked up in an `omz post
 
 **Revision history**
 
-- 17-Avr-2020 TPO - Initial release. """
+- 17-Avr-2020 TPO - Initial release.
+- 14-Oct-2026 TPO - The mail delegate is no longer retained once the compose
+  view is dismissed.
+- 14-Oct-2026 TPO - ObjC classes are only looked up once. Fixed
+  `dismiss_callback` being ignored after the first call.
+- 14-Oct-2026 TPO - Attachments are memory mapped instead of read.
+- 14-Oct-2026 TPO - Mail delegates are kept in a module level dict while the
+  compose view is displayed, objc_util.retain only holds the delegate
+  method. """
 
 
 import os
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import objc_util
 from objc_util import create_objc_class, NSData, NSObject, ObjCClass, \
@@ -27,7 +35,75 @@ from objc_util import create_objc_class, NSData, NSObject, ObjCClass, \
 
 
 objc_util.retain = getattr(objc_util, 'retain', [])
-objc_util.load_framework('MessageUI')
+# Only load the framework once, even if this module is reloaded
+if not getattr(objc_util, '_messageui_loaded', False):
+    objc_util.load_framework('MessageUI')
+    objc_util._messageui_loaded = True
+
+# Map attachments into memory instead of reading them (NSDataReadingOptions)
+NSDataReadingMappedIfSafe = 1
+
+# Mail delegate and dismiss callback of each compose view currently displayed,
+# keyed by ObjC pointer of the delegate. The ObjCInstance wrapper stored here
+# retains the delegate: removing the entry when the compose view is dismissed
+# releases it. Attached to objc_util, like objc_util.retain, so that it is
+# shared with the MailDelegate ObjC class created by a previous load of this
+# module.
+_inflight: Dict[int, Tuple[ObjCInstance, Optional[Callable[[], None]]]] = \
+    getattr(objc_util, 'mail_compose_inflight', {})
+objc_util.mail_compose_inflight = _inflight
+
+# ObjC classes, looked up once by _get_classes()
+_MailDelegate: Any = None
+_MFMailComposeViewController: Any = None
+# UIApplication singleton, looked up once by _shared_application()
+_UIApp: Any = None
+
+
+def _pointer(ptr: Any) -> int:
+    """ Return the int address of an ObjC pointer (a c_void_p or an int). """
+    return getattr(ptr, 'value', ptr) or 0
+
+
+def mailComposeController_didFinishWithResult_error_(
+        self, sel, controller, result, error):
+    """ MailDelegate method, called when the compose view is dismissed. """
+    mail_vc = ObjCInstance(controller)
+    mail_vc.setMailComposeDelegate_(None)
+    mail_vc.dismissViewControllerAnimated_completion_(True, None)
+    # Dropping the entry releases the delegate's ObjCInstance wrapper, which
+    # balances the retain done when the wrapper was created.
+    dismiss_callback = _inflight.pop(_pointer(self), (None, None))[1]
+    if dismiss_callback:
+        dismiss_callback()
+
+
+def _get_classes() -> Tuple[Any, Any]:
+    """ Return the MailDelegate and MFMailComposeViewController ObjC classes.
+
+    Classes are looked up (or created, for MailDelegate) on first call only. """
+    global _MailDelegate, _MFMailComposeViewController
+    if _MailDelegate is None:
+        try:
+            _MailDelegate = ObjCClass('MailDelegate')
+        except ValueError:
+            _MailDelegate = create_objc_class(
+                'MailDelegate',
+                superclass=NSObject,
+                methods=[mailComposeController_didFinishWithResult_error_],
+                protocols=['MFMailComposeViewControllerDelegate'])
+            objc_util.retain.append(
+                mailComposeController_didFinishWithResult_error_)
+        _MFMailComposeViewController = ObjCClass('MFMailComposeViewController')
+    return (_MailDelegate, _MFMailComposeViewController)
+
+
+def _shared_application() -> Any:
+    """ Return the shared UIApplication instance, looked up on first call. """
+    global _UIApp
+    if _UIApp is None:
+        _UIApp = UIApplication.sharedApplication()
+    return _UIApp
 
 
 @on_main_thread
@@ -60,7 +136,8 @@ def mail_compose(
         Mail body.
 
     filename: `str`, defaults to ``''``
-        If non-empty, name of a file to be attached to the email.
+        If non-empty, name of a file to be attached to the email. The email
+        is composed without an attachment if the file can't be read.
 
     mime_type: `str`, defaults to ``''``
         If `filename` is not empty, indicates the mime type of its contents,
@@ -70,44 +147,33 @@ def mail_compose(
         When set to a callable, it is called (with no arguments) when the mail
         composition view is dismissed. """
 
-    def mailComposeController_didFinishWithResult_error_(
-            self, sel, controller, result, error):
-        nonlocal dismiss_callback
-        mail_vc = ObjCInstance(controller)
-        mail_vc.setMailComposeDelegate_(None)
-        mail_vc.dismissViewControllerAnimated_completion_(True, None)
-        ObjCInstance(self).release()
-        if dismiss_callback:
-            dismiss_callback()
-
-    try:
-        MailDelegate = ObjCClass('MailDelegate')
-    except ValueError:
-        MailDelegate = create_objc_class(
-            'MailDelegate',
-            superclass=NSObject,
-            methods=[mailComposeController_didFinishWithResult_error_],
-            protocols=['MFMailComposeViewControllerDelegate'])
-        objc_util.retain.append(mailComposeController_didFinishWithResult_error_)
-    MFMailComposeViewController = ObjCClass('MFMailComposeViewController')
+    (MailDelegate, MFMailComposeViewController) = _get_classes()
+    # Find a view controller which is not already presenting, see
+    # https://forum.omz-software.com/topic/2060/presenting-viewcontroller/2
+    root_vc = _shared_application().keyWindow().rootViewController()
+    presented_vc = root_vc.presentedViewController()
+    while presented_vc:
+        root_vc = presented_vc
+        presented_vc = root_vc.presentedViewController()
+    is_html = body.startswith('<html>')
+    data = None
+    if filename:
+        # No prior existence check: NSData returns nil if the file can't be read
+        data = NSData.dataWithContentsOfFile_options_error_(
+            os.path.abspath(filename), NSDataReadingMappedIfSafe, None)
+    # Configure the compose view in one go, once all inputs are ready
     mail_vc = MFMailComposeViewController.alloc().init().autorelease()
     delegate = MailDelegate.alloc().init().autorelease()
-    objc_util.retain.append(delegate)
     mail_vc.setMailComposeDelegate_(delegate)
-    # Find a view controller which is not already presenting, see
-    # https://forum.omz-software.com/topic/2060/presenting-viewcontroller/2
-    root_vc = UIApplication.sharedApplication().keyWindow().rootViewController()
-    while root_vc.presentedViewController():
-        root_vc = root_vc.presentedViewController()
     mail_vc.setSubject_(subject)
     if recipients is not None:
         mail_vc.setToRecipients_(recipients)
-    mail_vc.setMessageBody_isHTML_(body, body.startswith('<html>'))
-    if filename and os.path.exists(filename):
-        mail_vc.addAttachmentData_mimeType_fileName_(
-            NSData.dataWithContentsOfFile_(os.path.abspath(filename)),
-            mime_type,
-            filename)
+    mail_vc.setMessageBody_isHTML_(body, is_html)
+    if data is not None:
+        mail_vc.addAttachmentData_mimeType_fileName_(data, mime_type, filename)
+    # Only keep the delegate once the compose view is known to be valid: init()
+    # returns nil when no mail account is set up, and the setters above raise.
+    _inflight[_pointer(delegate.ptr)] = (delegate, dismiss_callback)
     root_vc.presentViewController_animated_completion_(mail_vc, True, None)
 
 